@@ -7,38 +7,218 @@ from Apple's RSS feeds and saves them to JSON files.
 
 import json
 import argparse
+import asyncio
+import gzip
+import hashlib
+import http.client
+import os
+import re
+import threading
 import time
-import urllib.request
-import urllib.error
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+from typing import Dict, List, Optional, Tuple, TypedDict
+
+
+class Review(TypedDict):
+    """A review record as written to the output files.
+    
+    Numeric fields keep the string labels from Apple's feed; consumers such
+    as review_analyzer.py and the web app's review mapper convert them.
+    """
+    id: str
+    author: str
+    rating: str
+    version: str
+    title: str
+    content: str
+    updated: str
+    vote_sum: str
+    vote_count: str
 
 
 class AppReviewsFetcher:
     BASE_URL = "https://itunes.apple.com/us/rss/customerreviews"
     DELAY_BETWEEN_REQUESTS = 1  # seconds
     MAX_RETRIES = 3
+    REQUEST_TIMEOUT = 30  # seconds
+    REQUEST_HEADERS = {'Accept-Encoding': 'gzip, deflate', 'Connection': 'keep-alive'}
+    REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+    MAX_REDIRECTS = 5
+    MAX_CONNECTIONS = 4  # worker threads, each holding one keep-alive connection
+    PREFETCH_PAGES = 4  # pages requested ahead of the one being processed
+    CACHE_DIR = ".cache"
+    DEFAULT_CACHE_TTL = 3600  # seconds
+    INCREMENTAL_SORTS = ('mostrecent',)  # feeds where new reviews only appear at the front
     
-    def __init__(self, app_id: str):
+    def __init__(self, app_id: str, use_cache: bool = True, cache_ttl: int = DEFAULT_CACHE_TTL,
+                 incremental: bool = True):
         self.app_id = app_id
+        self.use_cache = use_cache
+        self.cache_ttl = cache_ttl
+        self.incremental = incremental
         self.session_stats = {
             "pages_fetched": 0,
+            "cache_hits": 0,
             "total_reviews": 0,
             "errors": 0
         }
+        # fetch_url runs in worker threads, so stats updates are serialized
+        self._stats_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Keep-alive connections per worker thread (one per host), reused across pages
+        self._local = threading.local()
+        self._connections: List[http.client.HTTPSConnection] = []
+    
+    def _bump_stat(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self.session_stats[key] += amount
+    
+    def page_url(self, sort_by: str, page_num: int) -> str:
+        """Build the feed URL for a given page of a sort type."""
+        return f"{self.BASE_URL}/page={page_num}/id={self.app_id}/sortby={sort_by}/json"
+    
+    def _cache_path(self, url: str) -> Path:
+        return Path(self.CACHE_DIR) / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json.gz"
+    
+    def read_cache(self, url: str) -> Optional[Dict]:
+        """Return the cached page for a URL if it is younger than the cache TTL."""
+        if not self.use_cache:
+            return None
+        path = self._cache_path(url)
+        try:
+            if time.time() - path.stat().st_mtime > self.cache_ttl:
+                return None
+            data = json.loads(gzip.decompress(path.read_bytes()))
+        except (OSError, ValueError, EOFError, zlib.error):
+            # Missing, unreadable, truncated or corrupt entries are treated as misses
+            return None
+        self._bump_stat("cache_hits")
+        return data
+    
+    def write_cache(self, url: str, body: bytes):
+        """Store a fetched page body, gzip-compressed, keyed by its URL."""
+        if not self.use_cache:
+            return
+        path = self._cache_path(url)
+        try:
+            path.parent.mkdir(exist_ok=True)
+            # Write then rename so a concurrent reader never sees a partial file
+            tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(gzip.compress(body))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not write cache entry for {url}: {e}")
+    
+    def _get_connection(self, host: str) -> http.client.HTTPSConnection:
+        """Return this thread's persistent connection to host, opening it if needed."""
+        conns = self._local.__dict__.setdefault('conns', {})
+        conn = conns.get(host)
+        if conn is None:
+            conn = http.client.HTTPSConnection(host, timeout=self.REQUEST_TIMEOUT)
+            conns[host] = conn
+            with self._stats_lock:
+                self._connections.append(conn)
+        return conn
+    
+    def _drop_connection(self, host: Optional[str] = None):
+        """Close this thread's connection to host (or all of them) so the next request reconnects."""
+        conns = self._local.__dict__.get('conns', {})
+        if host:
+            dropped = [conns.pop(host)] if host in conns else []
+        else:
+            dropped = list(conns.values())
+            conns.clear()
+        with self._stats_lock:
+            for conn in dropped:
+                conn.close()
+                self._connections.remove(conn)
+    
+    def close(self):
+        """Close all keep-alive connections."""
+        with self._stats_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+    
+    @staticmethod
+    def _decode_body(body: bytes, encoding: str) -> bytes:
+        """Undo the response's Content-Encoding."""
+        if encoding == 'gzip':
+            return gzip.decompress(body)
+        if encoding == 'deflate':
+            # Servers send either zlib-wrapped or raw deflate data
+            try:
+                return zlib.decompress(body)
+            except zlib.error:
+                return zlib.decompress(body, -zlib.MAX_WBITS)
+        return body
+    
+    def _get(self, url: str) -> Tuple[http.client.HTTPResponse, bytes]:
+        """Send a GET over this thread's connection to the URL's host.
+        
+        If the server has closed a reused keep-alive connection while it sat
+        idle, the request is resent once on a fresh connection; that is not
+        a network error.
+        """
+        parts = urlsplit(url)
+        path = f"{parts.path}?{parts.query}" if parts.query else parts.path
+        conn = self._get_connection(parts.netloc)
+        reused = conn.sock is not None
+        try:
+            conn.request('GET', path, headers=self.REQUEST_HEADERS)
+            response = conn.getresponse()
+        except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+            if not reused:
+                raise
+            self._drop_connection(parts.netloc)
+            conn = self._get_connection(parts.netloc)
+            conn.request('GET', path, headers=self.REQUEST_HEADERS)
+            response = conn.getresponse()
+        return response, response.read()
     
     def fetch_url(self, url: str) -> Optional[Dict]:
-        """Fetch JSON data from URL with retry logic."""
+        """Fetch JSON data from URL with retry and redirect handling."""
+        scheme = urlsplit(url).scheme
+        
         for attempt in range(self.MAX_RETRIES):
             try:
                 print(f"Fetching: {url}")
-                with urllib.request.urlopen(url) as response:
-                    data = json.loads(response.read().decode('utf-8'))
-                    self.session_stats["pages_fetched"] += 1
-                    return data
-            except (urllib.error.HTTPError, urllib.error.URLError) as e:
+                target = url
+                response, body = self._get(target)
+                
+                # Follow redirects, as urlopen used to
+                redirects = 0
+                while response.status in self.REDIRECT_STATUSES:
+                    location = response.getheader('Location')
+                    target = urljoin(target, location) if location else None
+                    if not target or urlsplit(target).scheme != scheme or redirects >= self.MAX_REDIRECTS:
+                        # Retrying would only hit the same redirect again
+                        print(f"Cannot follow HTTP {response.status} redirect for {url} (Location: {location})")
+                        self._bump_stat("errors")
+                        return None
+                    redirects += 1
+                    print(f"Redirected to: {target}")
+                    response, body = self._get(target)
+                
+                if response.status != 200:
+                    raise http.client.HTTPException(f"HTTP {response.status} {response.reason}")
+                
+                body = self._decode_body(body, response.getheader('Content-Encoding', ''))
+                
+                # json.loads detects UTF-8 in bytes itself, no decode copy needed
+                data = json.loads(body)
+                self._bump_stat("pages_fetched")
+                self.write_cache(url, body)
+                return data
+            except (http.client.HTTPException, OSError, EOFError, zlib.error) as e:
+                # EOFError / zlib.error come from truncated or corrupt compressed bodies
+                self._drop_connection()
                 print(f"Network error (attempt {attempt + 1}/{self.MAX_RETRIES}): {e}")
-                self.session_stats["errors"] += 1
+                self._bump_stat("errors")
                 if attempt < self.MAX_RETRIES - 1:
                     time.sleep(2 ** attempt)  # Exponential backoff
                 else:
@@ -46,10 +226,21 @@ class AppReviewsFetcher:
                     return None
             except json.JSONDecodeError as e:
                 print(f"JSON parsing error: {e}")
-                self.session_stats["errors"] += 1
+                self._bump_stat("errors")
                 return None
     
-    def extract_reviews(self, data: Dict) -> List[Dict]:
+    async def fetch_page(self, url: str) -> Optional[Dict]:
+        """Fetch a page on the shared connection pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.fetch_url, url)
+    
+    @staticmethod
+    def _label(entry: Dict, key: str, default: str = '') -> str:
+        """Return entry[key]['label'] without allocating a throwaway {} default."""
+        value = entry.get(key)
+        return value.get('label', default) if value else default
+    
+    def extract_reviews(self, data: Dict) -> List[Review]:
         """Extract review entries from RSS feed data."""
         reviews = []
         
@@ -59,24 +250,26 @@ class AppReviewsFetcher:
             if isinstance(entries, dict):
                 entries = [entries]
             
+            label = self._label
             for entry in entries:
-                review = {
-                    'id': entry.get('id', {}).get('label', ''),
-                    'author': entry.get('author', {}).get('name', {}).get('label', ''),
-                    'rating': entry.get('im:rating', {}).get('label', ''),
-                    'version': entry.get('im:version', {}).get('label', ''),
-                    'title': entry.get('title', {}).get('label', ''),
-                    'content': entry.get('content', {}).get('label', ''),
-                    'updated': entry.get('updated', {}).get('label', ''),
-                    'vote_sum': entry.get('im:voteSum', {}).get('label', '0'),
-                    'vote_count': entry.get('im:voteCount', {}).get('label', '0')
+                author = entry.get('author')
+                review: Review = {
+                    'id': label(entry, 'id'),
+                    'author': label(author, 'name') if author else '',
+                    'rating': label(entry, 'im:rating'),
+                    'version': label(entry, 'im:version'),
+                    'title': label(entry, 'title'),
+                    'content': label(entry, 'content'),
+                    'updated': label(entry, 'updated'),
+                    'vote_sum': label(entry, 'im:voteSum', '0'),
+                    'vote_count': label(entry, 'im:voteCount', '0')
                 }
                 reviews.append(review)
         
         return reviews
     
-    def get_next_page_url(self, data: Dict) -> Optional[str]:
-        """Extract next page URL from feed links."""
+    def get_last_page_number(self, data: Dict) -> Optional[int]:
+        """Extract the last page number from the feed's 'last' link."""
         if 'feed' in data and 'link' in data['feed']:
             links = data['feed']['link']
             # Ensure links is a list
@@ -84,71 +277,114 @@ class AppReviewsFetcher:
                 links = [links]
             
             for link in links:
-                if link.get('attributes', {}).get('rel') == 'next':
-                    next_url = link['attributes']['href']
-                    # Convert XML URL back to JSON format
-                    if 'xml' in next_url:
-                        next_url = next_url.replace('/xml', '/json')
-                        # Remove the urlDesc parameter
-                        if '?urlDesc=' in next_url:
-                            next_url = next_url.split('?urlDesc=')[0]
-                    return next_url
+                if link.get('attributes', {}).get('rel') == 'last':
+                    match = re.search(r'/page=(\d+)/', link['attributes'].get('href', ''))
+                    if match:
+                        return int(match.group(1))
         
         return None
     
-    def fetch_all_reviews(self, sort_by: str) -> Tuple[List[Dict], Dict]:
-        """Fetch all reviews for given sort type (mosthelpful or mostrecent)."""
+    async def fetch_all_reviews(self, sort_by: str,
+                                known_ids: Optional[set] = None) -> Tuple[List[Review], Dict]:
+        """Fetch all reviews for given sort type (mosthelpful or mostrecent).
+        
+        Pages follow a predictable page=K template, so PREFETCH_PAGES pages are
+        requested concurrently and then processed in order. Pagination stops at
+        the first empty or failed page, or past the feed's advertised last page.
+        Pages found in the on-disk cache skip the network and the rate limit.
+        
+        If known_ids is given, only reviews not in it are returned, and
+        pagination also stops at the first page after page 1 with no new reviews.
+        
+        metadata['complete'] is True only when the walk reached the end of the
+        feed (or, with known_ids, the already saved reviews) rather than
+        stopping at a failed page.
+        """
         all_reviews = []
         metadata = {
             'app_id': self.app_id,
             'sort_by': sort_by,
             'fetch_timestamp': datetime.now().isoformat(),
             'total_pages': 0,
-            'total_reviews': 0
+            'total_reviews': 0,
+            'complete': False
         }
         
-        # Start with first page
-        url = f"{self.BASE_URL}/page=1/id={self.app_id}/sortby={sort_by}/json"
         page_num = 1
+        last_page = None
+        done = False
         
-        while url:
-            print(f"\nFetching page {page_num} for {sort_by} reviews...")
-            
-            # Rate limiting
-            if page_num > 1:
-                time.sleep(self.DELAY_BETWEEN_REQUESTS)
+        while not done:
+            batch_end = page_num + self.PREFETCH_PAGES
+            if last_page:
+                batch_end = min(batch_end, last_page + 1)
+            pages = range(page_num, batch_end)
+            print(f"\nFetching pages {pages[0]}-{pages[-1]} for {sort_by} reviews...")
             
-            # Fetch page
-            data = self.fetch_url(url)
-            if not data:
-                print(f"Failed to fetch page {page_num}, stopping pagination")
-                break
+            urls = {n: self.page_url(sort_by, n) for n in pages}
+            # Cache reads (stat + gunzip + parse) run off the event loop too
+            cached = await asyncio.gather(*(asyncio.to_thread(self.read_cache, url) for url in urls.values()))
+            results = dict(zip(urls, cached))
+            missing = [n for n, data in results.items() if data is None]
+            if missing:
+                # Rate limiting between batches that go to the network
+                if page_num > 1:
+                    await asyncio.sleep(self.DELAY_BETWEEN_REQUESTS)
+                fetched = await asyncio.gather(*(self.fetch_page(urls[n]) for n in missing))
+                results.update(zip(missing, fetched))
             
-            # Extract reviews from this page
-            reviews = self.extract_reviews(data)
-            all_reviews.extend(reviews)
-            print(f"Found {len(reviews)} reviews on page {page_num}")
-            
-            # Get app name if available
-            if 'feed' in data and 'title' in data['feed'] and not metadata.get('app_name'):
-                metadata['app_name'] = data['feed']['title'].get('label', '').replace(' Customer Reviews', '')
+            for n in pages:
+                data = results[n]
+                if not data:
+                    print(f"Failed to fetch page {n}, stopping pagination")
+                    done = True
+                    break
+                
+                # Extract reviews from this page
+                page_reviews = self.extract_reviews(data)
+                if not page_reviews:
+                    print(f"No more pages found. Total pages: {metadata['total_pages']}")
+                    metadata['complete'] = True
+                    done = True
+                    break
+                
+                if known_ids:
+                    reviews = [r for r in page_reviews if r['id'] not in known_ids]
+                    print(f"Found {len(reviews)} new of {len(page_reviews)} reviews on page {n} ({sort_by})")
+                else:
+                    reviews = page_reviews
+                    print(f"Found {len(reviews)} reviews on page {n} ({sort_by})")
+                all_reviews.extend(reviews)
+                metadata['total_pages'] = n
+                
+                # Get app name if available
+                if 'feed' in data and 'title' in data['feed'] and not metadata.get('app_name'):
+                    metadata['app_name'] = data['feed']['title'].get('label', '').replace(' Customer Reviews', '')
+                
+                # The 'last' link bounds how far ahead it is worth prefetching
+                if last_page is None:
+                    last_page = self.get_last_page_number(data)
+                if last_page and n >= last_page:
+                    print(f"No more pages found. Total pages: {n}")
+                    metadata['complete'] = True
+                    done = True
+                    break
+                
+                # Everything further down was already fetched on a previous run
+                if known_ids and not reviews and n > 1:
+                    print(f"No new reviews on page {n}, stopping pagination")
+                    metadata['complete'] = True
+                    done = True
+                    break
             
-            # Check for next page
-            next_url = self.get_next_page_url(data)
-            if next_url and next_url != url:  # Avoid infinite loops
-                url = next_url
-                page_num += 1
-            else:
-                print(f"No more pages found. Total pages: {page_num}")
-                break
-        
-        metadata['total_pages'] = page_num
+            page_num = batch_end
+        
         metadata['total_reviews'] = len(all_reviews)
-        self.session_stats["total_reviews"] += len(all_reviews)
+        self._bump_stat("total_reviews", len(all_reviews))
         
         return all_reviews, metadata
     
-    def save_reviews_to_file(self, reviews: List[Dict], metadata: Dict, sort_by: str):
+    def save_reviews_to_file(self, reviews: List[Review], metadata: Dict, sort_by: str):
         """Save reviews and metadata to JSON file."""
         filename = f"{self.app_id}_{sort_by}.json"
         
@@ -157,25 +393,81 @@ class AppReviewsFetcher:
             'reviews': reviews
         }
         
+        # Compact, one-shot serialization: these files are machine-read, and
+        # without indent json uses its C encoder
         with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+            f.write(json.dumps(output, ensure_ascii=False, separators=(',', ':')))
         
         print(f"\nSaved {len(reviews)} reviews to {filename}")
     
+    def load_previous_reviews(self, file_suffix: str) -> List[Review]:
+        """Load the reviews saved by a previous run, if its walk completed.
+        
+        A file from a walk that stopped at a failed page is missing older
+        reviews, so it is not returned and the caller re-walks every page.
+        """
+        filename = f"{self.app_id}_{file_suffix}.json"
+        try:
+            with open(filename, 'rb') as f:
+                data = json.loads(f.read())
+            if not data['metadata'].get('complete'):
+                print(f"Previous walk for {filename} did not finish, re-fetching all pages")
+                return []
+            return data['reviews']
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Ignoring unreadable previous reviews in {filename}: {e}")
+            return []
+    
+    async def _fetch_and_save(self, sort_by: str, file_suffix: str) -> Dict:
+        """Fetch one sort type and write its file as soon as the walk finishes.
+        
+        For INCREMENTAL_SORTS, only reviews newer than the previous run's file
+        are downloaded and then prepended to it. The saved metadata then
+        describes this run's walk, except total_reviews, which counts the whole
+        merged file: total_pages is the number of pages walked this run and
+        new_reviews the number of reviews it added.
+        """
+        previous = []
+        if self.incremental and sort_by in self.INCREMENTAL_SORTS:
+            previous = await asyncio.to_thread(self.load_previous_reviews, file_suffix)
+        
+        reviews, metadata = await self.fetch_all_reviews(sort_by, {r['id'] for r in previous})
+        if previous:
+            metadata['new_reviews'] = len(reviews)
+            reviews = reviews + previous
+            metadata['total_reviews'] = len(reviews)
+        # The write runs off the event loop, overlapping the other walk's requests
+        await asyncio.to_thread(self.save_reviews_to_file, reviews, metadata, file_suffix)
+        return metadata
+    
+    async def _run(self) -> List[Dict]:
+        """Walk both sort types at once over a small pool of warm connections.
+        
+        Requests from both walks are queued onto the same MAX_CONNECTIONS
+        worker threads, so every page after the first few reuses an already
+        open connection instead of paying a new handshake.
+        """
+        self._executor = ThreadPoolExecutor(max_workers=self.MAX_CONNECTIONS)
+        try:
+            return await asyncio.gather(
+                self._fetch_and_save('mosthelpful', 'most_helpful'),
+                self._fetch_and_save('mostrecent', 'most_recent')
+            )
+        finally:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            self.close()
+    
     def fetch_and_save_all(self):
         """Fetch both Most Helpful and Most Recent reviews and save to files."""
         print(f"Starting review fetch for App ID: {self.app_id}")
         print("=" * 50)
         
-        # Fetch Most Helpful reviews
-        print("\n[1/2] Fetching Most Helpful reviews...")
-        helpful_reviews, helpful_metadata = self.fetch_all_reviews('mosthelpful')
-        self.save_reviews_to_file(helpful_reviews, helpful_metadata, 'most_helpful')
-        
-        # Fetch Most Recent reviews
-        print("\n[2/2] Fetching Most Recent reviews...")
-        recent_reviews, recent_metadata = self.fetch_all_reviews('mostrecent')
-        self.save_reviews_to_file(recent_reviews, recent_metadata, 'most_recent')
+        # Fetch Most Helpful and Most Recent reviews concurrently
+        print("\nFetching Most Helpful and Most Recent reviews...")
+        helpful_metadata, recent_metadata = asyncio.run(self._run())
         
         # Print summary
         print("\n" + "=" * 50)
@@ -183,7 +475,10 @@ class AppReviewsFetcher:
         print(f"App Name: {helpful_metadata.get('app_name', 'Unknown')}")
         print(f"Total Most Helpful reviews: {helpful_metadata['total_reviews']}")
         print(f"Total Most Recent reviews: {recent_metadata['total_reviews']}")
+        if 'new_reviews' in recent_metadata:
+            print(f"New Most Recent reviews since last run: {recent_metadata['new_reviews']}")
         print(f"Total pages fetched: {self.session_stats['pages_fetched']}")
+        print(f"Pages served from cache: {self.session_stats['cache_hits']}")
         print(f"Total errors encountered: {self.session_stats['errors']}")
         print("\nOutput files:")
         print(f"  - {self.app_id}_most_helpful.json")
@@ -198,6 +493,9 @@ def main():
 Example:
   python app_reviews_fetcher.py --app-id 1570489264
   
+  # Ignore cached pages and previous results, re-download everything
+  python app_reviews_fetcher.py --app-id 1570489264 --no-cache --full-refresh
+  
 This will create:
   - 1570489264_most_helpful.json
   - 1570489264_most_recent.json
@@ -210,10 +508,34 @@ This will create:
         help='iOS App Store app ID (e.g., 1570489264 for StoryGraph)'
     )
     
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help=f'Do not read or write the page cache in {AppReviewsFetcher.CACHE_DIR}/'
+    )
+    
+    parser.add_argument(
+        '--cache-ttl',
+        type=int,
+        default=AppReviewsFetcher.DEFAULT_CACHE_TTL,
+        help=f'Seconds a cached page stays valid (default: {AppReviewsFetcher.DEFAULT_CACHE_TTL})'
+    )
+    
+    parser.add_argument(
+        '--full-refresh',
+        action='store_true',
+        help='Re-fetch every Most Recent page instead of stopping at already saved reviews'
+    )
+    
     args = parser.parse_args()
     
     # Create fetcher and run
-    fetcher = AppReviewsFetcher(args.app_id)
+    fetcher = AppReviewsFetcher(
+        args.app_id,
+        use_cache=not args.no_cache,
+        cache_ttl=args.cache_ttl,
+        incremental=not args.full_refresh
+    )
     
     try:
         fetcher.fetch_and_save_all()
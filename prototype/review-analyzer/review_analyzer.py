@@ -7,100 +7,290 @@ using local processing and optional Ollama LLM integration.
 
 import json
 import argparse
+import calendar
+import math
 import re
+from array import array
 from datetime import datetime, timedelta
-from collections import Counter, defaultdict
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from typing import Dict, List, Tuple, Optional
 import statistics
-import subprocess
 import sys
+import urllib.error
+import urllib.request
+
+
+# Phrases that signal a feature request, combined into one alternation so each
+# review is scanned once
+FEATURE_REQUEST_RE = re.compile(
+    r"would be (?:nice|great|good) if"
+    r"|wish (?:it|this|the app)"
+    r"|should (?:add|have|include)"
+    r"|needs? (?:to|a|an)"
+    r"|missing"
+    r"|please add"
+    r"|feature request"
+)
+
+# Common issue keywords and categories (matched against low-rated reviews)
+ISSUE_CATEGORIES = {
+    'crashes_bugs': ['crash', 'bug', 'freeze', 'frozen', 'stuck', 'error', 'broken', 'fix', 'glitch'],
+    'performance': ['slow', 'lag', 'loading', 'performance', 'speed', 'responsive'],
+    'ui_ux': ['interface', 'design', 'confusing', 'intuitive', 'navigation', 'layout', 'ui', 'ux', 'user experience'],
+    'features': ['feature', 'missing', 'need', 'want', 'wish', 'add', 'implement', 'functionality'],
+    'sync_data': ['sync', 'data', 'lost', 'backup', 'restore', 'cloud', 'save'],
+    'pricing': ['expensive', 'price', 'cost', 'subscription', 'free', 'pay', 'premium'],
+    'search_discovery': ['search', 'find', 'discover', 'filter', 'sort'],
+    'social': ['friends', 'social', 'share', 'community', 'follow', 'profile']
+}
+
+# What users praise (matched against high-rated reviews)
+POSITIVE_KEYWORDS = {
+    'stats_analytics': ['stats', 'statistics', 'data', 'analytics', 'track', 'progress', 'graphs'],
+    'recommendations': ['recommend', 'suggestion', 'discover', 'find new'],
+    'ui_design': ['beautiful', 'clean', 'intuitive', 'easy to use', 'simple', 'design'],
+    'features': ['feature', 'love', 'great', 'amazing', 'perfect', 'excellent'],
+    'community': ['community', 'friends', 'social', 'share'],
+    'organization': ['organize', 'track', 'list', 'collection', 'library']
+}
+
+
+def compile_keyword_matchers(categories: Dict[str, List[str]]) -> Dict[str, re.Pattern]:
+    """Compile each category's keywords into a single substring regex."""
+    return {
+        category: re.compile('|'.join(re.escape(keyword) for keyword in keywords))
+        for category, keywords in categories.items()
+    }
+
+
+ISSUE_MATCHERS = compile_keyword_matchers(ISSUE_CATEGORIES)
+POSITIVE_MATCHERS = compile_keyword_matchers(POSITIVE_KEYWORDS)
+
+
+# Apple's extended timestamp form (2025-08-04T10:00:00-07:00), with each field
+# range-checked; the day is checked against its month in month_of
+FEED_TIMESTAMP_RE = re.compile(
+    r"(\d{4})-(0[1-9]|1[0-2])-(0[1-9]|[12]\d|3[01])"
+    r"T(?:[01]\d|2[0-3]):[0-5]\d:[0-5]\d(?:\.\d{1,6})?"
+    r"(?:Z|[+-](?:[01]\d|2[0-3]):[0-5]\d)"
+)
+
+
+def month_of(timestamp: str) -> Optional[str]:
+    """Return the 'YYYY-MM' month of an ISO 8601 timestamp, or None if it can't be read.
+    
+    Timestamps in the feed's extended form are validated by FEED_TIMESTAMP_RE
+    and the month is sliced off the string without building a datetime; any
+    other form falls back to datetime.fromisoformat, so both paths reject the
+    same invalid dates and times.
+    """
+    match = FEED_TIMESTAMP_RE.fullmatch(timestamp)
+    if match:
+        year, month, day = match.groups()
+        if year != '0000' and (day <= '28' or int(day) <= calendar.monthrange(int(year), int(month))[1]):
+            return timestamp[:7]
+        return None
+    try:
+        return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).strftime('%Y-%m')
+    except ValueError:
+        return None
+
+
+@dataclass
+class ReviewColumns:
+    """Reviews laid out as parallel per-field arrays, one entry per review."""
+    ids: Dict[str, int] = field(default_factory=dict)  # review ID -> row; also deduplicates
+    ratings: array = field(default_factory=lambda: array('b'))  # signed bytes, one per review
+    titles: List[str] = field(default_factory=list)
+    contents: List[str] = field(default_factory=list)
+    updated: List[str] = field(default_factory=list)
+    texts: List[str] = field(default_factory=list)  # lowercased "title content", scanned by the keyword matchers
+    
+    def extend(self, reviews: List[Dict]) -> int:
+        """Append reviews whose ID is not already present; return how many were added."""
+        ids = self.ids
+        added = 0
+        for r in reviews:
+            row = len(ids)
+            # One hash operation per review: setdefault only inserts unseen IDs
+            if ids.setdefault(r['id'], row) != row:
+                continue
+            self.ratings.append(int(r['rating']))
+            self.titles.append(r['title'])
+            self.contents.append(r['content'])
+            self.updated.append(r.get('updated', ''))
+            self.texts.append((r['title'] + ' ' + r['content']).lower())
+            added += 1
+        return added
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+@dataclass
+class ReviewAccumulators:
+    """Running totals gathered by ReviewAnalyzer's single pass over the reviews."""
+    rating_counts: List[int] = field(default_factory=lambda: [0] * 6)  # index = star rating
+    monthly_totals: Dict[str, List[int]] = field(default_factory=lambda: defaultdict(lambda: [0, 0]))  # [count, rating sum]
+    issue_categories: Dict[str, Dict] = field(default_factory=lambda: defaultdict(lambda: {'count': 0, 'examples': []}))
+    positive_counts: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    high_rated_count: int = 0
+    feature_requests_count: int = 0
+    feature_request_samples: List[Dict] = field(default_factory=list)
 
 
 class ReviewAnalyzer:
-    def __init__(self, app_id: str, use_llm: bool = False, llm_model: str = "mistral"):
+    OLLAMA_URL = "http://localhost:11434"
+    LLM_TIMEOUT = 60  # seconds for every LLM_TIMEOUT_REVIEWS reviews in a prompt Ollama runs alone
+    LLM_TIMEOUT_REVIEWS = 20
+    LLM_OPTIONS = {'num_ctx': 8192, 'num_predict': 400}  # bound memory and latency per prompt
+    LLM_BATCH_SIZE = 50  # reviews per prompt
+    LLM_MAX_BATCHES = 8
+    LLM_CONCURRENCY = 2  # prompts in flight at once
+    
+    def __init__(self, app_id: str, use_llm: bool = False, llm_model: str = "mistral",
+                 llm_timeout: Optional[float] = None):
         self.app_id = app_id
         self.use_llm = use_llm
         self.llm_model = llm_model
+        self.llm_timeout = llm_timeout or self.default_llm_timeout()
         self.reviews_data = {'most_helpful': None, 'most_recent': None}
+        self.columns: Optional[ReviewColumns] = None
         self.analysis_results = {}
+        self._ollama_available: Optional[bool] = None
         
     def load_reviews(self):
-        """Load review data from JSON files."""
-        try:
-            with open(f"{self.app_id}_most_helpful.json", 'r', encoding='utf-8') as f:
-                self.reviews_data['most_helpful'] = json.load(f)
-            print(f"✓ Loaded {len(self.reviews_data['most_helpful']['reviews'])} most helpful reviews")
-        except FileNotFoundError:
-            print(f"✗ Could not find {self.app_id}_most_helpful.json")
+        """Load review data from JSON files.
+        
+        Each file's reviews are folded into self.columns right after parsing,
+        most helpful first so its copy of a duplicate review wins. Only the
+        file metadata is kept in reviews_data, so at most one file's parsed
+        review dicts are alive at a time.
+        """
+        self.columns = ReviewColumns()
+        
+        for source in ['most_helpful', 'most_recent']:
+            filename = f"{self.app_id}_{source}.json"
+            try:
+                with open(filename, 'rb') as f:
+                    data = json.loads(f.read())
+            except FileNotFoundError:
+                print(f"✗ Could not find {filename}")
+                continue
             
-        try:
-            with open(f"{self.app_id}_most_recent.json", 'r', encoding='utf-8') as f:
-                self.reviews_data['most_recent'] = json.load(f)
-            print(f"✓ Loaded {len(self.reviews_data['most_recent']['reviews'])} most recent reviews")
-        except FileNotFoundError:
-            print(f"✗ Could not find {self.app_id}_most_recent.json")
+            reviews = data.pop('reviews')
+            self.columns.extend(reviews)
+            self.reviews_data[source] = data
+            print(f"✓ Loaded {len(reviews)} {source.replace('_', ' ')} reviews")
+            del reviews, data
             
         if not any(self.reviews_data.values()):
             raise ValueError("No review data found. Please run app_reviews_fetcher.py first.")
     
-    def get_all_reviews(self) -> List[Dict]:
-        """Combine all reviews from both sources, removing duplicates."""
-        all_reviews = []
-        seen_ids = set()
+    def _single_pass(self, columns: ReviewColumns) -> ReviewAccumulators:
+        """Walk the reviews once, updating the accumulators of every analysis.
         
-        for source in ['most_helpful', 'most_recent']:
-            if self.reviews_data[source]:
-                for review in self.reviews_data[source]['reviews']:
-                    if review['id'] not in seen_ids:
-                        review['source'] = source
-                        all_reviews.append(review)
-                        seen_ids.add(review['id'])
-        
-        return all_reviews
+        This loop runs once per review, so everything it touches repeatedly
+        (accumulators, bound regex search methods) is bound to locals first.
+        """
+        acc = ReviewAccumulators()
+        rating_counts = acc.rating_counts
+        monthly_totals = acc.monthly_totals
+        issue_categories = acc.issue_categories
+        positive_counts = acc.positive_counts
+        feature_request_samples = acc.feature_request_samples
+        issue_searches = [(category, matcher.search) for category, matcher in ISSUE_MATCHERS.items()]
+        positive_searches = [(category, matcher.search) for category, matcher in POSITIVE_MATCHERS.items()]
+        feature_search = FEATURE_REQUEST_RE.search
+        feature_requests_count = 0
+        
+        for rating, content, updated, text in zip(columns.ratings, columns.contents, columns.updated, columns.texts):
+            rating_counts[rating] += 1
+            
+            # Group by month
+            month = month_of(updated)
+            if month:
+                totals = monthly_totals[month]
+                totals[0] += 1
+                totals[1] += rating
+            
+            if rating <= 3:
+                # Focus on low-rated reviews for issues
+                for category, search in issue_searches:
+                    if search(text):
+                        stats = issue_categories[category]
+                        stats['count'] += 1
+                        if len(stats['examples']) < 3:  # Keep 3 examples
+                            stats['examples'].append({
+                                'rating': str(rating),
+                                'excerpt': content[:200] + '...' if len(content) > 200 else content
+                            })
+            else:
+                # High-rated reviews show what users love
+                for category, search in positive_searches:
+                    if search(text):
+                        positive_counts[category] += 1
+            
+            # Extract feature requests from all reviews
+            if feature_search(text):
+                feature_requests_count += 1
+                if len(feature_request_samples) < 5:  # Top 5 samples
+                    feature_request_samples.append({
+                        'rating': str(rating),
+                        'excerpt': content[:300] + '...' if len(content) > 300 else content
+                    })
+        
+        acc.high_rated_count = sum(rating_counts[4:])
+        acc.feature_requests_count = feature_requests_count
+        return acc
     
-    def analyze_ratings_distribution(self, reviews: List[Dict]) -> Dict:
+    def analyze_ratings_distribution(self, acc: ReviewAccumulators) -> Dict:
         """Analyze rating distribution and statistics."""
-        ratings = [int(review['rating']) for review in reviews]
-        rating_counts = Counter(ratings)
+        rating_counts = acc.rating_counts
+        total = sum(rating_counts)
         
         # Convert integer keys to strings for consistency
-        distribution = {str(k): v for k, v in rating_counts.items()}
+        distribution = {str(k): v for k, v in enumerate(rating_counts) if v}
+        
+        # Whole averages stay ints, as statistics.mean returned them
+        rating_sum = sum(k * v for k, v in enumerate(rating_counts))
+        average = rating_sum // total if rating_sum % total == 0 else rating_sum / total
         
         return {
             'distribution': distribution,
-            'total_reviews': len(ratings),
-            'average_rating': round(statistics.mean(ratings), 2),
-            'median_rating': statistics.median(ratings),
-            'low_ratings_count': sum(1 for r in ratings if r <= 3),
-            'high_ratings_count': sum(1 for r in ratings if r >= 4)
+            'total_reviews': total,
+            'average_rating': round(average, 2),
+            'median_rating': self._histogram_median(rating_counts, total),
+            'low_ratings_count': sum(rating_counts[:4]),
+            'high_ratings_count': sum(rating_counts[4:])
         }
     
-    def analyze_temporal_trends(self, reviews: List[Dict]) -> Dict:
+    @staticmethod
+    def _histogram_median(counts: List[int], total: int):
+        """Median of the values counted in a histogram (same result as statistics.median)."""
+        def value_at(position: int) -> int:
+            seen = 0
+            for value, count in enumerate(counts):
+                seen += count
+                if position < seen:
+                    return value
+        
+        if total % 2:
+            return value_at(total // 2)
+        return (value_at(total // 2 - 1) + value_at(total // 2)) / 2
+    
+    def analyze_temporal_trends(self, acc: ReviewAccumulators) -> Dict:
         """Analyze review trends over time."""
-        # Parse dates and sort by time
-        dated_reviews = []
-        for review in reviews:
-            try:
-                date = datetime.fromisoformat(review['updated'].replace('Z', '+00:00'))
-                dated_reviews.append((date, int(review['rating'])))
-            except:
-                continue
-        
-        dated_reviews.sort(key=lambda x: x[0])
-        
-        # Group by month
-        monthly_stats = defaultdict(lambda: {'count': 0, 'ratings': []})
-        for date, rating in dated_reviews:
-            month_key = date.strftime('%Y-%m')
-            monthly_stats[month_key]['count'] += 1
-            monthly_stats[month_key]['ratings'].append(rating)
-        
         # Calculate monthly averages
         monthly_trends = {}
-        for month, stats in monthly_stats.items():
+        for month, (count, rating_sum) in acc.monthly_totals.items():
+            # Whole averages stay ints, as statistics.mean returned them
+            avg = rating_sum // count if rating_sum % count == 0 else rating_sum / count
             monthly_trends[month] = {
-                'count': stats['count'],
-                'avg_rating': round(statistics.mean(stats['ratings']), 2)
+                'count': count,
+                'avg_rating': round(avg, 2)
             }
         
         # Recent trend (last 3 months vs previous 3 months)
@@ -116,134 +306,94 @@ class ReviewAnalyzer:
             'recent_avg_rating': round(recent_avg, 2)
         }
     
-    def extract_keywords_and_issues(self, reviews: List[Dict]) -> Dict:
-        """Extract common keywords and categorize issues from reviews."""
-        # Focus on low-rated reviews for issues
-        low_rated_reviews = [r for r in reviews if int(r['rating']) <= 3]
-        
-        # Common issue keywords and categories
-        issue_categories = {
-            'crashes_bugs': ['crash', 'bug', 'freeze', 'frozen', 'stuck', 'error', 'broken', 'fix', 'glitch'],
-            'performance': ['slow', 'lag', 'loading', 'performance', 'speed', 'responsive'],
-            'ui_ux': ['interface', 'design', 'confusing', 'intuitive', 'navigation', 'layout', 'ui', 'ux', 'user experience'],
-            'features': ['feature', 'missing', 'need', 'want', 'wish', 'add', 'implement', 'functionality'],
-            'sync_data': ['sync', 'data', 'lost', 'backup', 'restore', 'cloud', 'save'],
-            'pricing': ['expensive', 'price', 'cost', 'subscription', 'free', 'pay', 'premium'],
-            'search_discovery': ['search', 'find', 'discover', 'filter', 'sort'],
-            'social': ['friends', 'social', 'share', 'community', 'follow', 'profile']
-        }
-        
-        # Count issues by category
-        category_counts = defaultdict(lambda: {'count': 0, 'examples': []})
-        
-        for review in low_rated_reviews:
-            content = (review['title'] + ' ' + review['content']).lower()
-            
-            for category, keywords in issue_categories.items():
-                if any(keyword in content for keyword in keywords):
-                    category_counts[category]['count'] += 1
-                    if len(category_counts[category]['examples']) < 3:  # Keep 3 examples
-                        category_counts[category]['examples'].append({
-                            'rating': review['rating'],
-                            'excerpt': review['content'][:200] + '...' if len(review['content']) > 200 else review['content']
-                        })
-        
-        # Extract feature requests from all reviews
-        feature_patterns = [
-            r"would be (nice|great|good) if",
-            r"wish (it|this|the app)",
-            r"should (add|have|include)",
-            r"needs? (to|a|an)",
-            r"missing",
-            r"please add",
-            r"feature request"
-        ]
-        
-        feature_requests = []
-        for review in reviews:
-            content = (review['title'] + ' ' + review['content']).lower()
-            for pattern in feature_patterns:
-                if re.search(pattern, content):
-                    feature_requests.append({
-                        'rating': review['rating'],
-                        'excerpt': review['content'][:300] + '...' if len(review['content']) > 300 else review['content']
-                    })
-                    break
-        
+    def extract_keywords_and_issues(self, acc: ReviewAccumulators) -> Dict:
+        """Summarize categorized issues and feature requests."""
         return {
-            'issue_categories': dict(category_counts),
-            'total_issues_found': sum(cat['count'] for cat in category_counts.values()),
-            'feature_requests_count': len(feature_requests),
-            'feature_request_samples': feature_requests[:5]  # Top 5 samples
+            'issue_categories': dict(acc.issue_categories),
+            'total_issues_found': sum(cat['count'] for cat in acc.issue_categories.values()),
+            'feature_requests_count': acc.feature_requests_count,
+            'feature_request_samples': acc.feature_request_samples
         }
     
-    def analyze_positive_aspects(self, reviews: List[Dict]) -> Dict:
-        """Extract what users love about the app from high-rated reviews."""
-        high_rated_reviews = [r for r in reviews if int(r['rating']) >= 4]
-        
-        positive_keywords = {
-            'stats_analytics': ['stats', 'statistics', 'data', 'analytics', 'track', 'progress', 'graphs'],
-            'recommendations': ['recommend', 'suggestion', 'discover', 'find new'],
-            'ui_design': ['beautiful', 'clean', 'intuitive', 'easy to use', 'simple', 'design'],
-            'features': ['feature', 'love', 'great', 'amazing', 'perfect', 'excellent'],
-            'community': ['community', 'friends', 'social', 'share'],
-            'organization': ['organize', 'track', 'list', 'collection', 'library']
-        }
-        
-        positive_counts = defaultdict(int)
-        
-        for review in high_rated_reviews:
-            content = (review['title'] + ' ' + review['content']).lower()
-            
-            for category, keywords in positive_keywords.items():
-                if any(keyword in content for keyword in keywords):
-                    positive_counts[category] += 1
-        
+    def analyze_positive_aspects(self, acc: ReviewAccumulators) -> Dict:
+        """Summarize what users love about the app from high-rated reviews."""
         return {
-            'top_positive_aspects': dict(sorted(positive_counts.items(), key=lambda x: x[1], reverse=True)[:5]),
-            'total_positive_reviews': len(high_rated_reviews)
+            'top_positive_aspects': dict(sorted(acc.positive_counts.items(), key=lambda x: x[1], reverse=True)[:5]),
+            'total_positive_reviews': acc.high_rated_count
         }
     
+    def ollama_available(self) -> bool:
+        """Check once per run whether the Ollama server is reachable."""
+        if self._ollama_available is None:
+            try:
+                with urllib.request.urlopen(f"{self.OLLAMA_URL}/api/tags", timeout=5):
+                    self._ollama_available = True
+            except (urllib.error.URLError, OSError):
+                print("⚠️  Ollama is not running. Please start it with `ollama serve` (install from https://ollama.com)")
+                self._ollama_available = False
+        return self._ollama_available
+    
+    @classmethod
+    def default_llm_timeout(cls) -> int:
+        """Per-prompt timeout scaled to the batch size and the prompts in flight.
+        
+        Ollama shares its time between concurrent prompts, so each one can take
+        up to LLM_CONCURRENCY times as long as it would alone.
+        """
+        return cls.LLM_TIMEOUT * math.ceil(cls.LLM_BATCH_SIZE / cls.LLM_TIMEOUT_REVIEWS) * cls.LLM_CONCURRENCY
+    
     def query_ollama(self, prompt: str) -> Optional[str]:
-        """Query Ollama for LLM analysis."""
+        """Query Ollama for LLM analysis.
+        
+        Uses the server's REST API, which keeps the model loaded between
+        prompts, and asks for a JSON-formatted response.
+        """
+        if not self.ollama_available():
+            return None
+        
+        payload = json.dumps({
+            'model': self.llm_model,
+            'prompt': prompt,
+            'stream': False,
+            'format': 'json',
+            'options': self.LLM_OPTIONS
+        }).encode('utf-8')
+        request = urllib.request.Request(
+            f"{self.OLLAMA_URL}/api/generate",
+            data=payload,
+            headers={'Content-Type': 'application/json'}
+        )
+        
         try:
-            # Check if Ollama is running
-            result = subprocess.run(['ollama', 'list'], capture_output=True, text=True)
-            if result.returncode != 0:
-                print("⚠️  Ollama is not running. Please start Ollama first.")
-                return None
-            
-            # Run the query
-            cmd = ['ollama', 'run', self.llm_model, prompt]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-            
-            if result.returncode == 0:
-                return result.stdout.strip()
-            else:
-                print(f"⚠️  Ollama error: {result.stderr}")
-                return None
-                
-        except subprocess.TimeoutExpired:
-            print("⚠️  Ollama query timed out")
+            with urllib.request.urlopen(request, timeout=self.llm_timeout) as response:
+                return json.loads(response.read())['response'].strip()
+        except urllib.error.HTTPError as e:
+            print(f"⚠️  Ollama error: {e.read().decode('utf-8', 'replace')}")
             return None
-        except FileNotFoundError:
-            print("⚠️  Ollama not found. Please install Ollama from https://ollama.com")
+        except TimeoutError:
+            print(f"⚠️  Ollama query timed out after {self.llm_timeout:g}s (raise it with --llm-timeout)")
             return None
         except Exception as e:
             print(f"⚠️  Error querying Ollama: {e}")
             return None
     
-    def llm_analyze_issues(self, reviews: List[Dict]) -> Optional[Dict]:
-        """Use LLM to analyze issues and opportunities."""
-        if not self.use_llm:
+    def _parse_llm_response(self, response: Optional[str]) -> Optional[Dict]:
+        """Parse a JSON-formatted Ollama response into a dict."""
+        if not response:
             return None
-        
-        # Prepare a sample of low-rated reviews
-        low_rated = [r for r in reviews if int(r['rating']) <= 3][:20]  # Top 20 most relevant
-        
+        # format=json makes Ollama return a JSON document
+        try:
+            result = json.loads(response)
+        except json.JSONDecodeError:
+            result = None
+        # Return as structured text if not a JSON object
+        return result if isinstance(result, dict) else {'llm_analysis': response}
+    
+    def _analyze_review_batch(self, columns: ReviewColumns, indices: List[int]) -> Optional[Dict]:
+        """Ask the LLM for complaints, feature requests and an opportunity in one batch."""
         review_texts = []
-        for r in low_rated:
-            review_texts.append(f"Rating: {r['rating']}/5\nTitle: {r['title']}\nReview: {r['content'][:300]}...")
+        for i in indices:
+            review_texts.append(f"Rating: {columns.ratings[i]}/5\nTitle: {columns.titles[i]}\nReview: {columns.contents[i][:300]}...")
         
         prompt = f"""Analyze these iOS app reviews and identify:
 1. Top 3 most common user complaints
@@ -255,59 +405,132 @@ Reviews:
 
 Provide a concise analysis in JSON format with keys: complaints, feature_requests, main_opportunity"""
 
-        print("\n🤖 Analyzing reviews with Ollama...")
-        response = self.query_ollama(prompt)
+        return self._parse_llm_response(self.query_ollama(prompt))
+    
+    def _consolidate_llm_results(self, results: List[Dict]) -> Dict:
+        """Merge per-batch LLM results, then ask the LLM for an overall top 3.
         
-        if response:
-            try:
-                # Try to parse JSON from response
-                # Ollama might return markdown, so extract JSON
-                json_match = re.search(r'\{[\s\S]*\}', response)
-                if json_match:
-                    return json.loads(json_match.group())
-                else:
-                    # Return as structured text if not JSON
-                    return {'llm_analysis': response}
-            except:
-                return {'llm_analysis': response}
+        Batches whose reply was not a JSON object contribute their raw text,
+        both to the consolidation prompt and to the fallback result.
+        """
+        merged = {'complaints': [], 'feature_requests': [], 'main_opportunity': ''}
+        opportunities = []
+        unstructured = []
+        for result in results:
+            if 'llm_analysis' in result:
+                unstructured.append(result['llm_analysis'])
+                continue
+            for key in ('complaints', 'feature_requests'):
+                if isinstance(result.get(key), list):
+                    merged[key].extend(result[key])
+            if result.get('main_opportunity'):
+                opportunities.append(result['main_opportunity'])
+        merged['main_opportunity'] = opportunities[0] if opportunities else ''
+        other_findings = ''
+        if unstructured:
+            merged['llm_analysis'] = '\n\n'.join(unstructured)
+            print(f"  ⚠️  {len(unstructured)} LLM batch(es) answered in free text; passing it to the consolidation prompt")
+            other_findings = "\nOther findings (free text):\n" + '\n\n'.join(unstructured) + "\n"
+        
+        prompt = f"""These findings come from analyzing separate batches of reviews for the same iOS app.
+Consolidate them into:
+1. Top 3 most common user complaints
+2. Top 3 feature requests
+3. Main opportunity for improvement
+
+Complaints:
+{json.dumps(merged['complaints'], ensure_ascii=False)}
+
+Feature requests:
+{json.dumps(merged['feature_requests'], ensure_ascii=False)}
+
+Opportunities:
+{json.dumps(opportunities, ensure_ascii=False)}
+{other_findings}
+Provide a concise analysis in JSON format with keys: complaints, feature_requests, main_opportunity"""
+
+        print("  🤖 Consolidating batch results...")
+        consolidated = self._parse_llm_response(self.query_ollama(prompt))
+        if consolidated and 'llm_analysis' not in consolidated:
+            return consolidated
+        # Fall back to the concatenated batch findings
+        return merged
+    
+    def llm_analyze_issues(self, columns: ReviewColumns) -> Optional[Dict]:
+        """Use LLM to analyze issues and opportunities.
         
-        return None
+        Low-rated reviews are split into batches of LLM_BATCH_SIZE, analyzed
+        LLM_CONCURRENCY prompts at a time, and the batch results are then
+        consolidated by one final prompt.
+        """
+        if not self.use_llm:
+            return None
+        
+        # Prepare low-rated reviews, capped so a run stays within LLM_MAX_BATCHES prompts
+        low_rated = [i for i, rating in enumerate(columns.ratings) if rating <= 3][:self.LLM_BATCH_SIZE * self.LLM_MAX_BATCHES]
+        if not low_rated:
+            return None
+        batches = [low_rated[i:i + self.LLM_BATCH_SIZE] for i in range(0, len(low_rated), self.LLM_BATCH_SIZE)]
+        
+        print(f"\n🤖 Analyzing {len(low_rated)} reviews with Ollama in {len(batches)} batch(es)...")
+        if not self.ollama_available():
+            return None
+        
+        with ThreadPoolExecutor(max_workers=self.LLM_CONCURRENCY) as executor:
+            results = [
+                result
+                for result in executor.map(lambda batch: self._analyze_review_batch(columns, batch), batches)
+                if result
+            ]
+        
+        failed = len(batches) - len(results)
+        if failed:
+            print(f"⚠️  {failed} of {len(batches)} LLM batch(es) failed; their reviews are missing from the LLM insights")
+        
+        if not results:
+            return None
+        if len(results) == 1:
+            return results[0]
+        return self._consolidate_llm_results(results)
     
     def generate_summary_report(self):
         """Generate final analysis summary."""
-        all_reviews = self.get_all_reviews()
+        columns = self.columns
         
-        print(f"\n📊 Analyzing {len(all_reviews)} reviews for app {self.app_id}...")
+        print(f"\n📊 Analyzing {len(columns)} reviews for app {self.app_id}...")
         
         # Run analyses
         self.analysis_results['app_id'] = self.app_id
         self.analysis_results['analysis_date'] = datetime.now().isoformat()
-        self.analysis_results['total_reviews_analyzed'] = len(all_reviews)
+        self.analysis_results['total_reviews_analyzed'] = len(columns)
+        
+        # Collect everything in one pass over the reviews
+        acc = self._single_pass(columns)
         
         # Basic statistics
         print("  ✓ Calculating rating statistics...")
-        self.analysis_results['ratings'] = self.analyze_ratings_distribution(all_reviews)
+        self.analysis_results['ratings'] = self.analyze_ratings_distribution(acc)
         
         # Temporal trends
         print("  ✓ Analyzing temporal trends...")
-        self.analysis_results['trends'] = self.analyze_temporal_trends(all_reviews)
+        self.analysis_results['trends'] = self.analyze_temporal_trends(acc)
         
         # Issues and keywords
         print("  ✓ Extracting issues and feature requests...")
-        self.analysis_results['issues'] = self.extract_keywords_and_issues(all_reviews)
+        self.analysis_results['issues'] = self.extract_keywords_and_issues(acc)
         
         # Positive aspects
         print("  ✓ Analyzing positive feedback...")
-        self.analysis_results['positives'] = self.analyze_positive_aspects(all_reviews)
+        self.analysis_results['positives'] = self.analyze_positive_aspects(acc)
         
         # LLM analysis if enabled
         if self.use_llm:
-            llm_results = self.llm_analyze_issues(all_reviews)
+            llm_results = self.llm_analyze_issues(columns)
             if llm_results:
                 self.analysis_results['llm_insights'] = llm_results
                 print("  ✓ LLM analysis complete")
             else:
-                print("  ⚠️  LLM analysis skipped (Ollama not available)")
+                print("  ⚠️  LLM analysis skipped (no results from Ollama)")
         
         # App metadata
         if self.reviews_data['most_helpful']:
@@ -322,7 +545,7 @@ Provide a concise analysis in JSON format with keys: complaints, feature_request
         if output_format == 'json':
             filename = f"{self.app_id}_analysis_{timestamp}.json"
             with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(self.analysis_results, f, indent=2, ensure_ascii=False)
+                f.write(json.dumps(self.analysis_results, indent=2, ensure_ascii=False))
             print(f"\n✅ Analysis saved to {filename}")
             
         elif output_format == 'markdown':
@@ -385,6 +608,8 @@ Provide a concise analysis in JSON format with keys: complaints, feature_request
                             f.write(f"- {request}\n")
                     if 'main_opportunity' in r['llm_insights']:
                         f.write(f"\n### Main Opportunity\n{r['llm_insights']['main_opportunity']}\n")
+                    if 'llm_analysis' in r['llm_insights']:
+                        f.write(f"\n### Other Findings\n{r['llm_insights']['llm_analysis']}\n")
                 else:
                     f.write(r['llm_insights'].get('llm_analysis', ''))
             
@@ -441,6 +666,12 @@ Examples:
         help='Ollama model to use (default: mistral)'
     )
     
+    parser.add_argument(
+        '--llm-timeout',
+        type=float,
+        help=f'Seconds to wait for each Ollama prompt (default: {ReviewAnalyzer.default_llm_timeout()})'
+    )
+    
     parser.add_argument(
         '--output',
         choices=['json', 'markdown', 'both'],
@@ -451,7 +682,8 @@ Examples:
     args = parser.parse_args()
     
     # Create analyzer
-    analyzer = ReviewAnalyzer(args.app_id, use_llm=args.llm, llm_model=args.model)
+    analyzer = ReviewAnalyzer(args.app_id, use_llm=args.llm, llm_model=args.model,
+                              llm_timeout=args.llm_timeout)
     
     try:
         # Load reviews